@@ -0,0 +1,146 @@
+'''
+Non-interactive assistant mode: replays recorded games from a JSON-lines transcript file and
+writes the suggestions and remaining counts the assistant would have shown at every turn
+
+Each transcript line looks like
+{"game_id": "abc", "cheating": false, "turns": [{"guess": "TARES", "feedback": "XYXXG"}, ...]}
+'''
+
+import json
+import time
+import os
+import random
+from multiprocessing import Pool
+from wordle import *
+from generate_data import *
+from simulator import *
+
+NUM_SUGGESTIONS = 10
+CHUNK_SIZE = 8  # Games sent to a worker at a time while streaming the transcript file
+BATCH_STATE = {}
+
+def init_batch_worker(pattern_matrix, initial_expected_scores, freqs):
+    BATCH_STATE.update({
+        "pattern_matrix": pattern_matrix,
+        "initial_expected_scores": initial_expected_scores,
+        "freqs": freqs,
+        # Turn 1 suggestions never change, so sort the initial scores once per worker
+        "opening_suggestions": sorted(initial_expected_scores, key=initial_expected_scores.get)[:NUM_SUGGESTIONS],
+        # Suggestions keyed by remaining set, shared by every game this worker solves
+        "state_caches": {False: {}, True: {}},
+    })
+
+def read_transcripts(filename):
+    # Yields (line number, raw line) lazily, lines are parsed by the workers so a bad one
+    # only fails its own game
+    with open(filename, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                yield line_number, line
+
+def solve_transcript(item):
+    # Replays one recorded game through the assistant's filtering and suggestions
+    line_number, line = item
+    try:
+        game = json.loads(line)
+        if not isinstance(game, dict):
+            raise ValueError(f"expected a JSON object, got {type(game).__name__}")
+    except ValueError as e:
+        return {"game_id": None, "line": line_number, "error": f"Invalid transcript line: {e}"}
+
+    state = BATCH_STATE
+    cheating = game.get("cheating", False)
+    if not isinstance(cheating, bool):
+        # Strings like "false" would otherwise be truthy and silently switch modes
+        return {"game_id": game.get("game_id"), "line": line_number, "error": f"cheating must be true or false, got {cheating!r}"}
+    record = {"game_id": game.get("game_id"), "cheating": cheating, "turns": [], "solved": False}
+
+    guesses = set()
+    path = []
+    remaining_words = list(all_words)
+    possible_answers = set(possible_words)
+    suggested_guesses = state["opening_suggestions"]
+    latency = 0.0
+
+    try:
+        for score, turn in enumerate(game["turns"], 1):
+            guess = str(turn["guess"]).strip().upper()
+            if guess not in word_indices:
+                raise ValueError(f"{guess} is not an allowed word")
+            pattern = feedback_to_pattern(turn["feedback"])
+            pattern_int = string_to_pattern_int(pattern)
+            guesses.add(guess)
+
+            turn_record = {
+                "turn": score,
+                "guess": guess,
+                "feedback": pattern_to_feedback(pattern),
+                "suggestions": suggested_guesses[:NUM_SUGGESTIONS],
+                "suggestion_ms": round(latency * 1000, 2),
+            }
+            record["turns"].append(turn_record)
+
+            if pattern_int == 242:
+                record["solved"] = True
+                break
+
+            remaining_words, remaining_indices, possible_answers = filter_possible_words(guess, state["pattern_matrix"], pattern_int, remaining_words, possible_answers, cheating=cheating)
+            turn_record["remaining"] = len(remaining_words)
+            if len(remaining_words) == 0:
+                raise ValueError("No possible words remaining, the feedback is inconsistent")
+
+            path += [guess, pattern_int]
+            start = time.perf_counter()
+            suggested_guesses = get_next_suggestions(state["pattern_matrix"], state["freqs"], path, guesses, score + 1, remaining_words, remaining_indices, possible_answers, cheating=cheating, state_cache=state["state_caches"][cheating], verbose=False)
+            latency = time.perf_counter() - start
+
+        if not record["solved"]:
+            record["next_suggestions"] = suggested_guesses[:NUM_SUGGESTIONS]
+    except (KeyError, TypeError, ValueError) as e:
+        record["error"] = str(e)
+
+    return record
+
+def solve_transcripts(pattern_matrix, initial_expected_scores, freqs, input_filename, output_filename, processes=None):
+    # Streams the transcript file through the pool, writing records in input order as they finish
+    processes = processes or os.cpu_count()
+
+    start = time.time()
+    games = errors = 0
+    with open(output_filename, 'w') as f:
+        with Pool(processes, initializer=init_batch_worker, initargs=(pattern_matrix, initial_expected_scores, freqs)) as pool:
+            for record in pool.imap(solve_transcript, read_transcripts(input_filename), chunksize=CHUNK_SIZE):
+                games += 1
+                errors += "error" in record
+                f.write(json.dumps(record) + "\n")
+    elapsed = time.time() - start
+
+    print(f"Solved {games} games ({errors} with errors) in {elapsed:.1f}s with {processes} workers")
+    print(f"Throughput: {games / elapsed:.1f} games per second")
+    return games / elapsed
+
+def write_sample_transcripts(pattern_matrix, initial_expected_scores, freqs, filename, n=50, cheating=False, seed=0):
+    # Records bot games from random answers, e.g. for benchmarking solve_transcripts
+    rng = random.Random(seed)
+    with open(filename, 'w') as f:
+        for i, answer in enumerate(rng.sample(list(possible_words), n)):
+            _, guesses, _ = play_game_bot_with_freqs(str(answer), pattern_matrix, initial_expected_scores, freqs, cheating=cheating, discord=True)
+            turns = [{"guess": g, "feedback": pattern_to_feedback(word_eval(str(answer), g))} for g in guesses]
+            f.write(json.dumps({"game_id": str(i), "cheating": cheating, "turns": turns}) + "\n")
+
+def main():
+    pattern_matrix = get_pattern_matrix(all_words, all_words)
+    freqs = get_freqs()
+    initial_expected_scores = get_initial_expected_scores(freqs)
+
+    input_filename = ""
+    while not os.path.exists(input_filename):
+        input_filename = input("Enter the transcript file to solve: ").strip()
+        if not os.path.exists(input_filename):
+            print("File not found.")
+    output_filename = input("Enter the file to write suggestions to: ").strip()
+
+    solve_transcripts(pattern_matrix, initial_expected_scores, freqs, input_filename, output_filename)
+
+if __name__ == "__main__":
+    main()
@@ -39,6 +39,21 @@ async def starters(ctx, n=10):
         await(ctx.send(f"Generated words: {', '.join(words)}"))
         return
 
+# Command to list the best starting words measured by the tournament
+@bot.command()
+async def best_starters(ctx, n=10):
+    rankings = get_starter_rankings(cheating=True)
+    if not isinstance(n, int) or n <= 0:
+        await(ctx.send("Please provide a positive integer for the number of words to list."))
+        return
+    elif not rankings:
+        await(ctx.send("No tournament results yet, run tournament.py first."))
+        return
+    else:
+        lines = [f"{rank}. {r['starter']}: {r['mean_score']:.4f} average, {r['fail_count']} fails, worst {r['max_score']}" for rank, r in enumerate(rankings[:n], 1)]
+        await(ctx.send("Best starting words over all answers:\n" + "\n".join(lines)))
+        return
+
 # Command to make the bot play Wordle with given parameters
 @bot.command()
 async def play(ctx, target_word=None, starting_word=None):
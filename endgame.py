@@ -0,0 +1,140 @@
+'''
+Exact minimum expected guesses search for small remaining sets, used by the play loops
+in place of the entropy-based heuristics once few words are left
+'''
+
+import numpy as np
+from wordle import *
+from generate_data import *
+
+ENDGAME_SIZE = 20  # Largest remaining set the play loops solve exactly
+SHORTLIST_SIZE = 30  # Non-candidate guesses considered at each state
+ENDGAME_CACHE = {}
+ENDGAME_PRIORS = {}
+
+def get_endgame_prior(freqs, cheating=False):
+    # Weights aligned with all_words, uniform over the solution set when cheating and
+    # otherwise the saved default prior from freq.py
+    if cheating not in ENDGAME_PRIORS:
+        if cheating:
+            freq_probs = get_cheat_freq_probs(1)
+            ENDGAME_PRIORS[cheating] = np.array([freq_probs[str(word)] for word in all_words], dtype=float)
+        else:
+            ENDGAME_PRIORS[cheating] = get_word_priors()
+    return ENDGAME_PRIORS[cheating]
+
+def get_shortlist(pattern_matrix, remaining_indices, shortlist_size=SHORTLIST_SIZE, legal=None):
+    # Remaining words first (they can win outright), then the guesses splitting them into the most patterns.
+    # legal optionally restricts the non-candidate guesses to a boolean mask over all_words
+    if shortlist_size == 0:
+        return [int(i) for i in remaining_indices]
+    pool = np.arange(len(pattern_matrix)) if legal is None else np.nonzero(legal)[0]
+    rows = pattern_matrix[:, remaining_indices] if legal is None else pattern_matrix[np.ix_(pool, remaining_indices)]
+    patterns = np.sort(rows, axis=1)
+    num_partitions = 1 + np.count_nonzero(np.diff(patterns, axis=1), axis=1)
+    best = pool[np.argsort(-num_partitions, kind='stable')[:shortlist_size]]
+    return list(dict.fromkeys([int(i) for i in remaining_indices] + [int(i) for i in best]))
+
+def get_partitions(pattern_matrix, guess, remaining_indices, weights):
+    # Splits the remaining set by the guess's patterns, dropping the winning pattern
+    row = pattern_matrix[guess, remaining_indices]
+    partitions = []
+    for pattern in np.unique(row):
+        if pattern == 242:
+            continue
+        mask = row == pattern
+        partitions.append((remaining_indices[mask], weights[mask]))
+    return partitions
+
+def get_lower_bound(weights):
+    # Any guess is the answer with probability at most max(weights), otherwise at least one more guess follows
+    total = weights.sum()
+    return 1.0 if len(weights) == 1 else 2.0 - weights.max() / total
+
+def get_guess_cost(pattern_matrix, guess, remaining_indices, weights, prior, cache, best_cost=np.inf, shortlist_size=SHORTLIST_SIZE):
+    """
+    Expected number of guesses to finish when playing guess now, or None if that
+    can't beat best_cost. Partitions are solved exactly (and memoized) from most
+    to least likely, and the guess is abandoned once its cost so far plus the lower
+    bounds of the unsolved partitions reaches best_cost. shortlist_size is passed
+    down to the partitions' searches.
+    """
+    partitions = get_partitions(pattern_matrix, guess, remaining_indices, weights)
+    if len(partitions) == 1 and len(partitions[0][0]) == len(remaining_indices):
+        # Guess doesn't split the set and can't be the answer, so it never helps
+        return None
+
+    partitions.sort(key=lambda p: -p[1].sum())
+    bounds = [p[1].sum() * get_lower_bound(p[1]) for p in partitions]
+    remaining_bound = sum(bounds)
+    cost = 1.0
+    if cost + remaining_bound >= best_cost:
+        return None
+
+    for (indices, sub_weights), bound in zip(partitions, bounds):
+        sub_cost, _ = solve_endgame(pattern_matrix, indices, prior, cache, shortlist_size)
+        cost += sub_weights.sum() * sub_cost
+        remaining_bound -= bound
+        if cost + remaining_bound >= best_cost:
+            return None
+
+    return cost
+
+def solve_endgame(pattern_matrix, remaining_indices, prior, cache, shortlist_size=SHORTLIST_SIZE):
+    # Returns (minimum expected guesses, best guess index) for a set of remaining word indices.
+    # The cache must only be shared by searches using the same shortlist_size
+    key = remaining_indices.tobytes()
+    if key in cache:
+        return cache[key]
+
+    if len(remaining_indices) == 1:
+        cache[key] = (1.0, int(remaining_indices[0]))
+        return cache[key]
+
+    weights = prior[remaining_indices]
+    weights = weights / weights.sum()
+
+    best_cost, best_guess = np.inf, None
+    for guess in get_shortlist(pattern_matrix, remaining_indices, shortlist_size):
+        cost = get_guess_cost(pattern_matrix, guess, remaining_indices, weights, prior, cache, best_cost, shortlist_size)
+        if cost is not None and cost < best_cost:
+            best_cost, best_guess = cost, guess
+
+    cache[key] = (best_cost, best_guess)
+    return cache[key]
+
+def get_endgame_scores(pattern_matrix, remaining_indices, prior, cache, legal=None):
+    """
+    Exact expected guesses for every shortlisted guess, for ranking suggestions.
+
+    With a legal mask (hard mode) only legal guesses are scored now, and later turns
+    only guess remaining words. Those always use every revealed hint, whereas which other
+    words stay legal depends on the feedback, so the costs are upper bounds in hard mode.
+    """
+    remaining_indices = np.array(sorted(remaining_indices))
+    weights = prior[remaining_indices]
+    weights = weights / weights.sum()
+    shortlist_size = SHORTLIST_SIZE if legal is None else 0
+
+    scores = {}
+    for guess in get_shortlist(pattern_matrix, remaining_indices, legal=legal):
+        cost = get_guess_cost(pattern_matrix, guess, remaining_indices, weights, prior, cache, shortlist_size=shortlist_size)
+        if cost is not None:
+            scores[str(all_words[guess])] = cost
+    return scores
+
+def get_endgame_suggestions(pattern_matrix, remaining_words, freqs, cheating=False, max_size=ENDGAME_SIZE, legal=None):
+    # Suggested guesses sorted by exact expected score, or None if the remaining set is too large.
+    # legal is the hard mode mask of allowed guesses over all_words, see get_hard_mode_mask
+    if not max_size or len(remaining_words) == 0 or len(remaining_words) > max_size:
+        return None
+
+    prior = get_endgame_prior(freqs, cheating)
+    remaining_indices = [word_indices[str(word)] for word in remaining_words]
+    if prior[remaining_indices].sum() == 0:
+        return None
+
+    # Hard mode searches use a different shortlist below the first guess, so they get their own cache
+    cache = ENDGAME_CACHE.setdefault((cheating, legal is not None), {})
+    scores = get_endgame_scores(pattern_matrix, remaining_indices, prior, cache, legal)
+    return sorted(scores, key=scores.get)
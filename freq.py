@@ -1,30 +1,184 @@
 """
-Generates word_freq.json for the relative frequencies of each allowed word
+Generates word_freq_updated.json for the relative frequencies of each allowed word, and the
+prior array aligned with all_words that the solver loads (see get_word_priors)
+
+Words are fetched in batches by a pool of workers from a pluggable source. Finished batches
+are checkpointed, so an interrupted run picks up where it stopped, and words already in
+word_freq_updated.json are never fetched again.
 """
 
-import numpy as np
 import json
 import numbers
-from wolframclient.evaluation import WolframLanguageSession
-from wolframclient.language import wl
+import os
+import re
+import time
+import zlib
+import random
+from collections import Counter
+from multiprocessing import Pool
+from multiprocessing.util import Finalize
+from generate_data import *
+
+FREQS_FILENAME = './data/word_freq_updated.json'
+CHECKPOINT_FILENAME = './data/word_freq_checkpoint.json'
+BATCH_SIZE = 200
+CHECKPOINT_EVERY = 5  # Batches between checkpoint writes
+FREQ_STATE = {}
+
+# A source is a dict with a "name", a "fetch" function mapping a batch of lowercase words to
+# {word: relative frequency}, and a "close" function. Words a source knows nothing about get 0.0
+
+def get_wolfram_source(kernel_path=None):
+    # WordFrequencyData from a local Wolfram kernel. kernel_path defaults to $WOLFRAM_KERNEL,
+    # otherwise wolframclient looks for an installed kernel
+    from wolframclient.evaluation import WolframLanguageSession
+    from wolframclient.language import wl
+
+    session = WolframLanguageSession(kernel=kernel_path or os.environ.get("WOLFRAM_KERNEL"))
+
+    def fetch(words):
+        # One evaluation per batch instead of one per word
+        results = session.evaluate(wl.Map(wl.WordFrequencyData, list(words)))
+        return {word: float(freq) if isinstance(freq, numbers.Number) else 0.0 for word, freq in zip(words, results)}
+
+    return {"name": "wolfram", "fetch": fetch, "close": session.terminate}
+
+def get_corpus_source(path):
+    # Relative frequencies counted from a plain text corpus, as a fraction of all words in it
+    counts = Counter()
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            counts.update(re.findall(r"[a-z]+", line.lower()))
+    total = sum(counts.values()) or 1
+
+    def fetch(words):
+        return {word: counts[word] / total for word in words}
+
+    return {"name": "corpus", "fetch": fetch, "close": lambda: None}
+
+def get_fake_source(fail_rate=0.0, seed=0):
+    # Deterministic made-up frequencies for checking the pipeline without a kernel. Each batch
+    # fails with probability fail_rate to exercise checkpointing and resuming, decided by its
+    # first word so the same batches fail on every run whichever worker fetches them
+    def fetch(words):
+        if random.Random(seed + zlib.crc32(words[0].encode())).random() < fail_rate:
+            raise RuntimeError("Fake source failure")
+        return {word: zlib.crc32(word.encode()) / 2**32 * 1e-5 for word in words}
+
+    return {"name": "fake", "fetch": fetch, "close": lambda: None}
+
+SOURCES = {"wolfram": get_wolfram_source, "corpus": get_corpus_source, "fake": get_fake_source}
+
+def init_freq_worker(source_name, source_args):
+    # Sources hold kernels and file contents, so each worker builds its own and closes it on exit
+    FREQ_STATE["source"] = SOURCES[source_name](*source_args)
+    Finalize(None, FREQ_STATE["source"]["close"], exitpriority=10)
+
+def fetch_batch(batch):
+    # Returns (batch, frequencies or None, error message or None) so one bad batch doesn't stop the run
+    try:
+        return batch, FREQ_STATE["source"]["fetch"](batch), None
+    except Exception as e:
+        return batch, None, f"{type(e).__name__}: {e}"
+
+def load_freqs(filename):
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, 'r') as f:
+        return {word.lower(): freq for word, freq in json.load(f).items()}
+
+def save_freqs(freqs, filename):
+    # Written to a temporary file first so an interrupted write never corrupts the cache
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, 'w') as f:
+        json.dump({word: freqs[word] for word in sorted(freqs)}, f)
+    os.replace(temp_filename, filename)
+
+def get_missing_words(words, freqs):
+    return [word for word in (str(w).lower() for w in words) if word not in freqs]
+
+def fetch_frequencies(source_name, source_args=(), words=None, filename=FREQS_FILENAME, checkpoint_filename=CHECKPOINT_FILENAME, batch_size=BATCH_SIZE, processes=4):
+    """
+    Fetches the frequencies of every word missing from filename and the checkpoint, and
+    returns the merged frequencies along with the words still missing. Completed batches
+    are checkpointed every CHECKPOINT_EVERY batches. Once nothing is missing they are
+    merged into filename and the checkpoint is removed, otherwise rerunning resumes.
+    """
+    words = all_words if words is None else words
+    freqs = load_freqs(filename)
+    checkpoint = load_freqs(checkpoint_filename)
+    missing = get_missing_words(words, {**freqs, **checkpoint})
+    print(f"{len(freqs)} words cached, {len(checkpoint)} checkpointed, {len(missing)} to fetch from {source_name}")
+
+    batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+    failed = []
+    start = time.time()
+    if batches:
+        processes = min(processes, len(batches))
+        pool = Pool(processes, initializer=init_freq_worker, initargs=(source_name, tuple(source_args)))
+        try:
+            for done, (batch, batch_freqs, error) in enumerate(pool.imap_unordered(fetch_batch, batches), 1):
+                if error is not None:
+                    print(f"Batch starting at {batch[0]} failed: {error}")
+                    failed.extend(batch)
+                else:
+                    checkpoint.update(batch_freqs)
+                if done % CHECKPOINT_EVERY == 0:
+                    save_freqs(checkpoint, checkpoint_filename)
+                    print(f"{done}/{len(batches)} batches done, {len(checkpoint)} words checkpointed")
+            # Letting the workers exit normally runs their finalizers, which close the sources
+            pool.close()
+            pool.join()
+        finally:
+            # Saved even when interrupted, so the next run only fetches what is left
+            save_freqs(checkpoint, checkpoint_filename)
+            pool.terminate()
+    print(f"Fetched {len(missing) - len(failed)} words in {time.time() - start:.1f}s, {len(failed)} failed")
+
+    freqs.update(checkpoint)
+    if not failed:
+        save_freqs(freqs, filename)
+        if os.path.exists(checkpoint_filename):
+            os.remove(checkpoint_filename)
+    return freqs, failed
+
+def check_resume(num_words=2000, batch_size=50):
+    # Runs the fake source with failures into temporary files, then resumes it and checks
+    # that the second run only fetched what the first one missed
+    filename, checkpoint_filename = './data/word_freq_check.json', './data/word_freq_check_checkpoint.json'
+    words = all_words[:num_words]
+    try:
+        _, failed = fetch_frequencies("fake", (0.3,), words, filename, checkpoint_filename, batch_size)
+        freqs, still_failed = fetch_frequencies("fake", (0.0,), words, filename, checkpoint_filename, batch_size)
+        expected = get_fake_source()["fetch"]([str(w).lower() for w in words])
+        print(f"First run missed {len(failed)} words, resumed run missed {len(still_failed)}")
+        print(f"{sum(freqs.get(w) == f for w, f in expected.items())}/{len(expected)} frequencies match the fake source")
+        return freqs == expected and not still_failed
+    finally:
+        for f in (filename, checkpoint_filename):
+            if os.path.exists(f):
+                os.remove(f)
 
-all_words = np.loadtxt('./data/allowed_words.txt', dtype=str)
+def main():
+    response = ""
+    while response not in {"1", "2"}:
+        response = input("Which frequency source (1 - Wolfram kernel, 2 - Corpus file): ").strip()
 
-all_words = set(word.upper() for word in all_words)
+    if response == "1":
+        source_name, source_args = "wolfram", (input("Path to WolframKernel (blank to auto-detect): ").strip() or None,)
+    else:
+        path = ""
+        while not os.path.exists(path):
+            path = input("Enter the corpus file: ").strip()
+        source_name, source_args = "corpus", (path,)
 
-kernel_path = r"C:\Program Files\Wolfram Research\Wolfram\14.3\WolframKernel.exe"
-with WolframLanguageSession(kernel=kernel_path) as session:
+    freqs, failed = fetch_frequencies(source_name, source_args)
+    if failed:
+        print(f"{len(failed)} words are still missing, run again to fetch them")
+        return
 
-    freqs = {}
+    priors = save_word_priors(freqs)
+    print(f"Saved priors for {len(priors)} words")
 
-    for word in sorted(all_words):
-        word = word.lower()
-        freq = session.evaluate(wl.WordFrequencyData(word))
-        if isinstance(freq, numbers.Number):
-            freqs[word] = freq
-        else:
-            freqs[word] = 0.0
-        print(f"Frequency of {word}: {freqs[word]}")
-        
-    with open('./data/word_freq_updated.json', 'w') as f:
-        json.dump(freqs, f)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,16 @@ else:
 NUM_ALLOWED = len(all_words)
 NUM_POSSIBLE = len(possible_words)
 PATTERN_MATRIX = None
+PRIOR_ARRAY = None
+PRIOR_PROBS = None
+OPENING_BOOKS = {}
+
+# Precision of pattern distributions used for scoring. "counts" keeps integer pattern
+# histograms and only applies when all nonzero weights are equal (cheating)
+SCORING_PRECISION = "float64"
+PRECISION_DTYPES = {"float64": np.float64, "float32": np.float32, "counts": np.uint16}
+# float32 results within this of the best are rescored in float64, well above float32 entropy error
+FLOAT32_TIE_TOLERANCE = 1e-3
 
 def main():
     # Get pattern matrix
@@ -165,32 +175,100 @@ def get_freq_probs(freqs, n=3000, width=10):
     
     return freq_probs
 
+def get_prior_array(freqs, n=3000, width=10):
+    # get_freq_probs as an array aligned with all_words
+    freq_probs = get_freq_probs(freqs, n=n, width=width)
+    return np.array([freq_probs[str(word)] for word in all_words])
+
+def save_word_priors(freqs):
+    priors = get_prior_array(freqs)
+    np.save('./data/word_priors.npy', priors)
+    return priors
+
+# Default prior aligned with all_words, the single source of the non-cheating prior for
+# the solver. freq.py rewrites it whenever the frequencies change, and it is rebuilt here
+# if word_freq_updated.json has been changed since without rerunning freq.py
+def get_word_priors():
+    global PRIOR_ARRAY
+    if PRIOR_ARRAY is None:
+        filename = './data/word_priors.npy'
+        if os.path.exists(filename) and os.path.getmtime(filename) >= os.path.getmtime('./data/word_freq_updated.json'):
+            PRIOR_ARRAY = np.load(filename)
+        else:
+            PRIOR_ARRAY = save_word_priors(get_freqs())
+    return PRIOR_ARRAY
+
+# get_word_priors keyed by word, in the same form as get_freq_probs
+def get_word_prior_probs():
+    global PRIOR_PROBS
+    if PRIOR_PROBS is None:
+        PRIOR_PROBS = dict(zip((str(word) for word in all_words), get_word_priors()))
+    return PRIOR_PROBS
+
 def get_weights(remaining_words, freq_probs):
     weights = np.array([freq_probs[str(word)] for word in remaining_words])
     total = weights.sum()
     return weights / total if total != 0 else np.zeros(weights.shape)
 
-def get_distributions(all_words, remaining_words, weights):
+def set_scoring_precision(precision):
+    global SCORING_PRECISION
+    if precision not in PRECISION_DTYPES:
+        raise ValueError(f"Unknown scoring precision {precision}, expected one of {list(PRECISION_DTYPES)}")
+    SCORING_PRECISION = precision
+
+def has_uniform_weights(weights):
+    nonzero = weights[weights > 0]
+    return len(nonzero) > 0 and np.all(nonzero == nonzero[0])
+
+def get_distributions(all_words, remaining_words, weights, precision=None):
     # Distributions holds the probability distributions of each word's patterns
     # Rows - allowed words (same order as pattern matrix), Cols - patterns
-    distributions = np.zeros( (len(all_words), 3**5) )
-    pattern_matrix = get_pattern_matrix(all_words, remaining_words)
-
-    n = np.arange(len(all_words))
-    for i, weight in enumerate(weights):
-        distributions[n, pattern_matrix[:,i]] += weight
+    precision = precision or SCORING_PRECISION
+    if precision == "counts" and not has_uniform_weights(weights):
+        precision = "float64"
+
+    distributions = np.zeros( (len(all_words), 3**5), dtype=PRECISION_DTYPES[precision] )
+    # Transposed so each remaining word's patterns are contiguous, and indexed through a
+    # flat view so every update is a single gather/scatter over rows * 243 + pattern
+    patterns = np.ascontiguousarray(get_pattern_matrix(all_words, remaining_words).T)
+    flat = distributions.reshape(-1)
+    offsets = np.arange(len(all_words)) * 3**5
+
+    if precision == "counts":
+        # Equal weights only scale the histogram, so count words with nonzero weight instead
+        for i in np.nonzero(weights)[0]:
+            flat[offsets + patterns[i]] += 1
+    else:
+        for i, weight in enumerate(weights.astype(distributions.dtype)):
+            flat[offsets + patterns[i]] += weight
 
     return distributions
 
+def get_entropy_from_counts(counts):
+    # H = log2(N) - sum(c * log2(c)) / N for a histogram of counts summing to N
+    axis = len(counts.shape) - 1
+    totals = counts.sum(axis=axis, dtype=np.int64)
+    xlogx = np.zeros(totals.max() + 1)
+    xlogx[1:] = np.arange(1, len(xlogx)) * np.log2(np.arange(1, len(xlogx)))
+    return np.log2(totals) - xlogx[counts].sum(axis=axis) / totals
+
 def get_entropy_with_freqs(distributions):  
+    if np.issubdtype(distributions.dtype, np.integer):
+        return get_entropy_from_counts(distributions)
     axis = len(distributions.shape) - 1
     return entropy(distributions, base=2, axis=axis)
 
-def get_entropies(all_words, remaining_words, weights):
+def get_entropies(all_words, remaining_words, weights, precision=None):
     if weights.sum() == 0:
         return np.zeros(len(all_words))
-    distributions = get_distributions(all_words, remaining_words, weights)
-    return get_entropy_with_freqs(distributions)
+    distributions = get_distributions(all_words, remaining_words, weights, precision)
+    entropies = get_entropy_with_freqs(distributions)
+    if (precision or SCORING_PRECISION) == "float32":
+        # Rescore near-ties for the max entropy so the best guess is the same as with float64
+        near = np.nonzero(entropies >= entropies.max() - FLOAT32_TIE_TOLERANCE)[0]
+        entropies = entropies.astype(np.float64)
+        entropies[near] = get_entropies([all_words[i] for i in near], remaining_words, weights, "float64")
+    return entropies
 
 # Maximize the expected score instead of expected information gain
 # E[score] = P(word) * guess_# + 
@@ -202,17 +280,24 @@ def guesses_from_entropy(entropy):
     return min_score + 1.5 * entropy / 11.5
 
 # Expected scores for remaining words given their weights/probs of being the answer
-def get_expected_scores(all_words, remaining_words, weights):
+def get_expected_scores(all_words, remaining_words, weights, precision=None):
     curr_entropy = get_entropy_with_freqs(weights)
-    expected_entropies = get_entropies(all_words, remaining_words, weights)
     word_weights = dict(zip(remaining_words, weights))
     probs = np.array([word_weights.get(word, 0) for word in all_words])
+    if (precision or SCORING_PRECISION) == "float32" and weights.sum() > 0:
+        # The best score isn't the max entropy, so near-ties are found and rescored on the scores
+        expected_entropies = get_entropy_with_freqs(get_distributions(all_words, remaining_words, weights, "float32")).astype(np.float64)
+        scores = probs + (1 - probs) * (1 + guesses_from_entropy(curr_entropy - expected_entropies))
+        near = np.nonzero(scores <= scores.min() + FLOAT32_TIE_TOLERANCE)[0]
+        expected_entropies[near] = get_entropies([all_words[i] for i in near], remaining_words, weights, "float64")
+    else:
+        expected_entropies = get_entropies(all_words, remaining_words, weights, precision)
     return probs + (1 - probs) * (1 + guesses_from_entropy(curr_entropy - expected_entropies))
 
 def get_initial_expected_scores(frequencies):
     if not os.path.exists('./data/initial_expected_scores.json'):
         with open('./data/initial_expected_scores.json', 'w') as f:
-            freq_probs = get_freq_probs(frequencies)
+            freq_probs = get_word_prior_probs()
             weights = get_weights(all_words, freq_probs)
             scores = get_expected_scores(all_words, all_words, weights)
             scores = {word: float(score) for word, score in zip(all_words, scores)}
@@ -235,6 +320,39 @@ def get_cheat_freq_probs(turn_num, remaining_words=None):
         freq_probs = {w: int(w in possible_words) for w in remaining_words}
     return freq_probs
 
+def get_opening_book_filename(cheating=False):
+    return './data/opening_book_cheat.json' if cheating else './data/opening_book.json'
+
+def get_opening_book_key(path):
+    # Path alternates guesses and pattern ints, e.g. TARES,45,CLOTH,12
+    return ",".join(str(x) for x in path)
+
+def get_opening_book(cheating=False):
+    filename = get_opening_book_filename(cheating)
+    if filename not in OPENING_BOOKS:
+        if os.path.exists(filename):
+            with open(filename, 'r') as f:
+                OPENING_BOOKS[filename] = json.load(f)
+        else:
+            OPENING_BOOKS[filename] = {}
+    return OPENING_BOOKS[filename]
+
+# Precomputed suggestions for the guess after the given path, or None if the book doesn't cover it
+def get_opening_book_suggestions(path, cheating=False):
+    suggestions = get_opening_book(cheating).get(get_opening_book_key(path))
+    return list(suggestions) if suggestions is not None else None
+
+def get_tournament_filename(cheating=True):
+    return './data/starter_tournament_cheat.json' if cheating else './data/starter_tournament.json'
+
+# Ranked starters from tournament.py, best first, or an empty list if it hasn't been run
+def get_starter_rankings(cheating=True):
+    filename = get_tournament_filename(cheating)
+    if not os.path.exists(filename):
+        return []
+    with open(filename, 'r') as f:
+        return json.load(f)
+
 def two_step_expected_scores():
     # if not os.path.exists('./data/2step_initial_scores.json'):
     #     with open('./data/2step_initial_scores.json', 'w') as f:
@@ -0,0 +1,167 @@
+'''
+Prunes the guess space before probe scoring: collapses guesses that are partition-equivalent
+over the remaining words and skips guesses whose entropy upper bound can't beat the best found
+'''
+
+import numpy as np
+import random
+import time
+from wordle import *
+from generate_data import *
+
+CHUNK_SIZE = 500
+NUM_SUGGESTIONS = 10  # Leading probe guesses guaranteed to match scoring every allowed word
+BOUND_TOLERANCE = 1e-9
+GUESS_INDEX = None
+
+def build_guess_index(words):
+    """
+    Per-guess letter data used to bound and deduplicate guesses at any state.
+
+    letters[g, i] is the letter (0-25) at position i of guess g.
+    repeated[g, i] is true when that letter appears more than once in the guess.
+    first_copy[g, i] is true for the leftmost copy of a repeated letter.
+    """
+    letters = words_to_int_arrays([str(w) for w in words]) - ord('A')
+    same = letters[:, :, None] == letters[:, None, :]
+    repeated = same.sum(axis=2) > 1
+    earlier = np.tril(np.ones((5, 5), dtype=bool), k=-1)  # earlier[i, j] is true when j < i
+    first_copy = repeated & ~(same & earlier).any(axis=2)
+    return {"letters": letters, "repeated": repeated, "first_copy": first_copy}
+
+def get_guess_index():
+    global GUESS_INDEX
+    if GUESS_INDEX is None:
+        GUESS_INDEX = build_guess_index(all_words)
+    return GUESS_INDEX
+
+def safe_entropy(probs, axis):
+    # Entropy in bits where zero probabilities contribute nothing
+    logs = np.log2(probs, out=np.zeros_like(probs), where=probs > 0)
+    return -(probs * logs).sum(axis=axis)
+
+def get_entropy_bounds(index, remaining_words, weights):
+    """
+    Upper bounds on every guess's pattern entropy over the remaining words, from
+    subadditivity: the entropy of a pattern is at most the sum of the entropies of
+    its parts. A letter used once contributes the entropy of its own green/yellow/gray
+    color, and a repeated letter the entropy of where that letter sits in the answer,
+    which determines the colors of all its copies.
+    """
+    answer_letters = words_to_int_arrays([str(w) for w in remaining_words]) - ord('A')
+    onehot = answer_letters[:, :, None] == np.arange(26)  # (words, position, letter)
+    weights = weights / weights.sum()
+
+    green = np.einsum('w,wil->il', weights, onehot)
+    present = weights @ onehot.any(axis=1)
+    color_probs = np.stack(np.broadcast_arrays(green, present - green, 1 - present), axis=-1).clip(0, 1)
+    color_entropy = safe_entropy(color_probs, axis=-1)  # (position, letter)
+
+    # masks[w, c] records which positions of word w hold letter c as a 5-bit int
+    masks = (onehot * (1 << np.arange(5))[None, :, None]).sum(axis=1)
+    cells = (np.arange(26) * 32 + masks).ravel()
+    mask_probs = np.bincount(cells, weights=np.repeat(weights, 26), minlength=26 * 32).reshape(26, 32)
+    mask_entropy = safe_entropy(mask_probs, axis=-1)  # (letter,)
+
+    letters = index["letters"]
+    single = np.where(index["repeated"], 0, color_entropy[np.arange(5), letters]).sum(axis=1)
+
+    # Each repeated letter counts once however many copies the guess has
+    multi = np.where(index["first_copy"], mask_entropy[letters], 0).sum(axis=1)
+
+    answer_entropy = safe_entropy(weights, axis=0)
+    return np.minimum(single + multi, answer_entropy)
+
+def get_representatives(index, remaining_words, guesses, legal=None):
+    # Letters missing from every remaining word always come back gray, so guesses that only
+    # differ in those letters split the remaining words identically. Returns the first guess
+    # of each class along with every class's members, both as indices into all_words.
+    # legal optionally restricts the guesses to a boolean mask over all_words (hard mode)
+    answer_letters = words_to_int_arrays([str(w) for w in remaining_words]) - ord('A')
+    absent = np.ones(26, dtype=bool)
+    absent[np.unique(answer_letters)] = False
+
+    signatures = np.where(absent[index["letters"]], 26, index["letters"])
+    available = np.array([str(w) not in guesses for w in all_words])
+    if legal is not None:
+        available &= legal
+    candidates = np.nonzero(available)[0]
+    _, first, classes = np.unique(signatures[candidates], axis=0, return_index=True, return_inverse=True)
+    # Group candidates by class with one stable sort, so each class keeps all_words order
+    order = np.argsort(classes.ravel(), kind='stable')
+    groups = np.split(candidates[order], np.cumsum(np.bincount(classes.ravel()))[:-1])
+    members = {int(candidates[f]): group for f, group in zip(first, groups)}
+    return np.sort(candidates[first]), members
+
+def get_pruned_probe_guesses(remaining_words, weights, guesses, legal=None, num_suggestions=NUM_SUGGESTIONS):
+    """
+    Probe guesses sorted by entropy, evaluating representatives in order of decreasing
+    upper bound and stopping once no unevaluated bound can reach the num_suggestions-th
+    best entropy. Each representative's class shares its entropy, so all of them are
+    listed. The first num_suggestions guesses match scoring every allowed word (or every
+    legal one when a hard mode mask is given), including the tie-breaking order. Later
+    guesses are only those that happened to be scored and can skip better ones.
+    """
+    index = get_guess_index()
+    representatives, members = get_representatives(index, remaining_words, guesses, legal)
+    bounds = get_entropy_bounds(index, remaining_words, weights)[representatives]
+    order = representatives[np.argsort(-bounds, kind='stable')]
+    sorted_bounds = np.sort(bounds)[::-1]
+
+    evaluated, entropies = [], []
+    cutoff = -np.inf  # Entropy of the num_suggestions-th best guess scored so far
+    for start in range(0, len(order), CHUNK_SIZE):
+        if sorted_bounds[start] + BOUND_TOLERANCE < cutoff:
+            break
+        chunk = order[start:start + CHUNK_SIZE]
+        # Always float64: the bounds only prune correctly against exact entropies
+        chunk_entropies = get_entropies(all_words[chunk], remaining_words, weights, precision="float64")
+        evaluated.extend(int(g) for g in chunk)
+        entropies.extend(chunk_entropies)
+
+        # Count every member of a class, since they all rank alongside their representative
+        ranked = np.sort(np.repeat(entropies, [len(members[g]) for g in evaluated]))[::-1]
+        if len(ranked) >= num_suggestions:
+            cutoff = ranked[num_suggestions - 1]
+
+    # Sort by entropy, breaking ties by position in all_words like the unpruned scoring
+    scored = [(int(m), e) for g, e in zip(evaluated, entropies) for m in members[g]]
+    ranked = sorted(scored, key=lambda x: (-x[1], x[0]))
+    return [str(all_words[g]) for g, _ in ranked]
+
+def compare_pruned_scoring(num_states=50, cheating=True, seed=0):
+    # Agreement of the top suggestions and speedup of pruned probe scoring against scoring every allowed word
+    from simulator import filter_possible_words
+    pattern_matrix = get_pattern_matrix(all_words, all_words)
+    freqs = get_freqs()
+    rng = random.Random(seed)
+    agree = 0
+    full_time = pruned_time = 0
+
+    for _ in range(num_states):
+        answer = str(rng.choice(possible_words))
+        guess = str(rng.choice(all_words))
+        pattern_int = string_to_pattern_int(word_eval(answer, guess))
+        remaining_words, _, _ = filter_possible_words(guess, pattern_matrix, pattern_int, list(all_words), set(possible_words), cheating=cheating)
+        freq_probs = get_word_prior_probs() if not cheating else get_cheat_freq_probs(2, remaining_words)
+        weights = get_weights(remaining_words, freq_probs)
+
+        start = time.perf_counter()
+        entropies = get_entropies(all_words, remaining_words, weights)
+        candidates = {str(w): e for w, e in zip(all_words, entropies) if w != guess}
+        full_top = sorted(candidates, key=candidates.get, reverse=True)[:NUM_SUGGESTIONS]
+        full_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        pruned_top = get_pruned_probe_guesses(remaining_words, weights, [guess])[:NUM_SUGGESTIONS]
+        pruned_time += time.perf_counter() - start
+
+        agree += full_top == pruned_top
+
+    print(f"Top {NUM_SUGGESTIONS} agreement: {agree}/{num_states}")
+    print(f"Full scoring: {full_time:.2f}s, pruned scoring: {pruned_time:.2f}s ({full_time / pruned_time:.1f}x faster)")
+    return agree, full_time, pruned_time
+
+if __name__ == "__main__":
+    compare_pruned_scoring(cheating=True)
+    compare_pruned_scoring(cheating=False)
@@ -0,0 +1,194 @@
+'''
+Inverted letter index over a word list for filtering by accumulated Wordle feedback
+without the pattern matrix
+'''
+
+import numpy as np
+import hashlib
+import random
+import time
+from wordle import *
+from generate_data import *
+
+NUM_LETTERS = 26
+WORD_LENGTH = 5
+LETTER_INDEX = {}
+
+def build_letter_index(words):
+    """
+    Builds packed bitsets over a list of words. Bit k of every bitset
+    corresponds to words[k].
+
+    positions[i, c] is set for words with letter c at position i.
+    at_least[c, k] is set for words containing letter c at least k times,
+    so "exactly k" and "at most k" are both a single AND/NOT away.
+    """
+    word_arr = words_to_int_arrays([str(w).upper() for w in words]) - ord('A')
+    letters = np.arange(NUM_LETTERS)
+
+    # position_masks[i, c, w] is true when words[w][i] == c
+    position_masks = word_arr.T[:, None, :] == letters[None, :, None]
+
+    # counts[c, w] is the number of occurrences of letter c in words[w]
+    counts = position_masks.sum(axis=0)
+    count_masks = counts[:, None, :] >= np.arange(WORD_LENGTH + 1)[None, :, None]
+
+    return {
+        "words": np.array([str(w) for w in words]),
+        "positions": np.packbits(position_masks, axis=-1),
+        "at_least": np.packbits(count_masks, axis=-1),
+    }
+
+def get_letter_index(words=None):
+    # Cache one index per word list since building it touches every letter of every word.
+    # Other lists are keyed on their full contents so different lists never share an index
+    if words is None:
+        words, key = all_words, None
+    else:
+        key = hashlib.sha1("\n".join(str(w) for w in words).encode()).hexdigest()
+    if key not in LETTER_INDEX:
+        LETTER_INDEX[key] = build_letter_index(words)
+    return LETTER_INDEX[key]
+
+def new_constraints():
+    return {
+        "green": np.full(WORD_LENGTH, -1, dtype=np.int8),
+        "excluded": np.zeros((WORD_LENGTH, NUM_LETTERS), dtype=bool),
+        "min_counts": np.zeros(NUM_LETTERS, dtype=np.int8),
+        "max_counts": np.full(NUM_LETTERS, WORD_LENGTH, dtype=np.int8),
+        "contradiction": False,
+    }
+
+def add_feedback(constraints, guess, pattern):
+    """
+    Folds one guess and its feedback into the accumulated constraints, following
+    the same duplicate-letter rules as word_eval: each green or yellow copy of a
+    letter raises its minimum count, and a gray copy caps the count at that minimum.
+    pattern may be a pattern int or a list of MISS/MISPLACED/EXACT values.
+    """
+    if isinstance(pattern, (int, np.integer)):
+        pattern = pattern_int_to_string(int(pattern))
+    guess = guess.upper()
+
+    found = {}
+    grayed = set()
+    for i, (c, p) in enumerate(zip(guess, pattern)):
+        letter = ord(c) - ord('A')
+        if p == EXACT:
+            if constraints["green"][i] not in (-1, letter):
+                constraints["contradiction"] = True
+            constraints["green"][i] = letter
+            found[letter] = found.get(letter, 0) + 1
+        else:
+            # A yellow or gray letter can't be at this position, otherwise it would be green
+            constraints["excluded"][i, letter] = True
+            if p == MISPLACED:
+                # word_eval hands out yellows left to right, so a yellow after a gray is impossible
+                if letter in grayed:
+                    constraints["contradiction"] = True
+                found[letter] = found.get(letter, 0) + 1
+            else:
+                grayed.add(letter)
+
+    for letter in set(found) | grayed:
+        k = found.get(letter, 0)
+        constraints["min_counts"][letter] = max(constraints["min_counts"][letter], k)
+        if letter in grayed:
+            constraints["max_counts"][letter] = min(constraints["max_counts"][letter], k)
+
+    return constraints
+
+def get_constraints(guesses, patterns):
+    constraints = new_constraints()
+    for guess, pattern in zip(guesses, patterns):
+        add_feedback(constraints, guess, pattern)
+    return constraints
+
+def get_constraint_mask(index, constraints):
+    # Returns a packed bitset of the words in the index satisfying every constraint
+    positions, at_least = index["positions"], index["at_least"]
+    mask = np.full(positions.shape[-1], 0xFF, dtype=np.uint8)
+
+    if constraints["contradiction"] or np.any(constraints["min_counts"] > constraints["max_counts"]):
+        return np.zeros_like(mask)
+
+    for i, letter in enumerate(constraints["green"]):
+        if letter >= 0:
+            mask &= positions[i, letter]
+
+    for i, letter in zip(*np.nonzero(constraints["excluded"])):
+        mask &= ~positions[i, letter]
+
+    for letter in np.nonzero(constraints["min_counts"])[0]:
+        mask &= at_least[letter, constraints["min_counts"][letter]]
+
+    for letter in np.nonzero(constraints["max_counts"] < WORD_LENGTH)[0]:
+        mask &= ~at_least[letter, constraints["max_counts"][letter] + 1]
+
+    return mask
+
+def filter_with_constraints(constraints, words=None):
+    index = get_letter_index(words)
+    mask = get_constraint_mask(index, constraints)
+    bits = np.unpackbits(mask, count=len(index["words"])).astype(bool)
+    return index["words"][bits].tolist()
+
+def get_hard_mode_mask(constraints, words=None):
+    """
+    Boolean mask over the index's words of the guesses allowed in hard mode, where
+    every revealed hint has to be used: greens stay at their positions and every
+    green or yellow letter appears at least as often as it has been revealed.
+    Grays and yellow positions don't restrict guesses, only possible answers.
+    """
+    index = get_letter_index(words)
+    positions, at_least = index["positions"], index["at_least"]
+    mask = np.full(positions.shape[-1], 0xFF, dtype=np.uint8)
+
+    for i, letter in enumerate(constraints["green"]):
+        if letter >= 0:
+            mask &= positions[i, letter]
+
+    for letter in np.nonzero(constraints["min_counts"])[0]:
+        mask &= at_least[letter, constraints["min_counts"][letter]]
+
+    return np.unpackbits(mask, count=len(index["words"])).astype(bool)
+
+def filter_with_letter_index(guesses, patterns, words=None):
+    # Standalone replacement for chained filter_possible_words calls
+    return filter_with_constraints(get_constraints(guesses, patterns), words)
+
+def cross_check_letter_index(num_games=200, num_guesses=3, seed=0):
+    # Compares the letter index against filter_possible_words on random games
+    # Imported here since simulator.py imports this module
+    from simulator import filter_possible_words
+    pattern_matrix = get_pattern_matrix(all_words, all_words)
+    rng = random.Random(seed)
+    mismatches = 0
+    index_time = matrix_time = 0
+
+    for _ in range(num_games):
+        answer = str(rng.choice(possible_words))
+        guesses = [str(rng.choice(all_words)) for _ in range(num_guesses)]
+        patterns = [string_to_pattern_int(word_eval(answer, guess)) for guess in guesses]
+
+        start = time.perf_counter()
+        remaining_words = list(all_words)
+        possible_answers = set(possible_words)
+        for guess, pattern_int in zip(guesses, patterns):
+            remaining_words, _, possible_answers = filter_possible_words(guess, pattern_matrix, pattern_int, remaining_words, possible_answers)
+        matrix_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        index_words = filter_with_letter_index(guesses, patterns)
+        index_time += time.perf_counter() - start
+
+        if set(index_words) != set(remaining_words):
+            mismatches += 1
+            print(f"Mismatch for {answer} with guesses {guesses}")
+
+    print(f"{num_games - mismatches}/{num_games} games matched filter_possible_words")
+    print(f"Pattern matrix filtering: {matrix_time:.3f}s, letter index filtering: {index_time:.3f}s")
+    return mismatches
+
+if __name__ == "__main__":
+    cross_check_letter_index()
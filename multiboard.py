@@ -0,0 +1,143 @@
+'''
+Multi-board (Quordle/Octordle) solver where every guess is played on all unsolved boards
+at once, scored jointly from one pass over the shared pattern matrix
+'''
+
+import numpy as np
+import random
+import time
+from wordle import *
+from generate_data import *
+
+MAX_GUESSES = {4: 9, 8: 13}  # Quordle and Octordle guess limits
+CHUNK_SIZE = 1000
+
+def get_board_histograms(pattern_matrix, guess_indices, boards, chunk_size=CHUNK_SIZE):
+    """
+    Weighted pattern histograms of every guess on every board, shape (guesses, boards, 243).
+
+    The remaining words of all boards are concatenated into one set of columns, so each
+    guess's row of the pattern matrix is gathered once and a single bincount over
+    guess * boards * 243 + board * 243 + pattern fills every board's histogram.
+    """
+    columns = np.concatenate([indices for indices, _ in boards])
+    weights = np.concatenate([w for _, w in boards])
+    board_offsets = np.concatenate([np.full(len(indices), b * 3**5) for b, (indices, _) in enumerate(boards)])
+    cells = len(boards) * 3**5
+
+    histograms = np.zeros((len(guess_indices), len(boards), 3**5))
+    for start in range(0, len(guess_indices), chunk_size):
+        rows = guess_indices[start:start + chunk_size]
+        flat = np.arange(len(rows))[:, None] * cells + board_offsets[None, :] + pattern_matrix[np.ix_(rows, columns)]
+        counts = np.bincount(flat.ravel(), weights=np.broadcast_to(weights, flat.shape).ravel(), minlength=len(rows) * cells)
+        histograms[start:start + len(rows)] = counts.reshape(len(rows), len(boards), 3**5)
+    return histograms
+
+def get_joint_scores(pattern_matrix, boards):
+    # Sum over boards of each guess's expected score on that board, using the same
+    # estimate as get_expected_scores
+    guess_indices = np.arange(NUM_ALLOWED)
+    histograms = get_board_histograms(pattern_matrix, guess_indices, boards)
+    expected_entropies = get_entropy_with_freqs(histograms)  # (guesses, boards)
+
+    scores = np.zeros(NUM_ALLOWED)
+    for b, (indices, weights) in enumerate(boards):
+        probs = np.zeros(NUM_ALLOWED)
+        probs[indices] = weights
+        curr_entropy = get_entropy_with_freqs(weights)
+        scores += probs + (1 - probs) * (1 + guesses_from_entropy(curr_entropy - expected_entropies[:, b]))
+    return scores
+
+def get_multiboard_guess(pattern_matrix, boards, guesses):
+    # A board down to one word is a free solve, otherwise take the best joint score
+    for indices, _ in boards:
+        if len(indices) == 1:
+            return int(indices[0])
+
+    scores = get_joint_scores(pattern_matrix, boards)
+    scores[guesses] = np.inf
+    return int(np.argmin(scores))
+
+def get_initial_board(freqs, cheating=False):
+    if cheating:
+        freq_probs = get_cheat_freq_probs(1)
+        prior = np.array([freq_probs[str(word)] for word in all_words], dtype=float)
+    else:
+        prior = get_word_priors()
+    indices = np.nonzero(prior)[0]
+    return indices, prior[indices] / prior[indices].sum()
+
+def play_multiboard_game(answers, pattern_matrix, freqs, starting_word, cheating=False, verbose=True):
+    # Plays one guess sequence against every answer and returns the number of guesses taken
+    answer_indices = [word_indices[str(a)] for a in answers]
+    if verbose: print(f"Answers are {', '.join(str(a) for a in answers)}")
+
+    initial_indices, initial_weights = get_initial_board(freqs, cheating)
+    boards = {b: (initial_indices, initial_weights) for b in range(len(answers))}
+    guesses = []
+
+    while boards:
+        guess = word_indices[starting_word] if not guesses else get_multiboard_guess(pattern_matrix, list(boards.values()), guesses)
+        guesses.append(guess)
+
+        for b in list(boards):
+            if guess == answer_indices[b]:
+                del boards[b]
+                continue
+            indices, weights = boards[b]
+            keep = pattern_matrix[guess, indices] == pattern_matrix[guess, answer_indices[b]]
+            boards[b] = (indices[keep], weights[keep] / weights[keep].sum())
+
+        if verbose:
+            patterns = " ".join(get_emoji_pattern(pattern_matrix[guess, a]) for a in answer_indices)
+            print(f"Guess {len(guesses)}: {all_words[guess]} -> {patterns}")
+
+    return len(guesses)
+
+def simulate_multiboard(pattern_matrix, freqs, num_boards=4, num_games=100, cheating=False, starting_word=None, seed=0):
+    # Plays random tuples of distinct answers from the solution set
+    rng = random.Random(seed)
+    if starting_word is None:
+        scores = get_initial_expected_scores(freqs)
+        starting_word = min(scores, key=scores.get)
+    limit = MAX_GUESSES.get(num_boards, num_boards + 5)
+
+    start = time.time()
+    attempt_count = {}
+    for _ in range(num_games):
+        answers = rng.sample(list(possible_words), num_boards)
+        score = play_multiboard_game(answers, pattern_matrix, freqs, starting_word, cheating=cheating, verbose=False)
+        attempt_count[score] = attempt_count.get(score, 0) + 1
+    elapsed = time.time() - start
+
+    print(f"Attempt distribution over {num_games} games with {num_boards} boards:\n")
+    for k in sorted(attempt_count):
+        print(f"{k} attempts: {attempt_count[k]}")
+    total = sum(k * v for k, v in attempt_count.items())
+    fails = sum(v for k, v in attempt_count.items() if k > limit)
+    print(f"Average number of attempts: {total / num_games:.4f}, {fails} games over the {limit} guess limit")
+    print(f"Played {num_games} games in {elapsed:.1f}s ({num_games / elapsed:.2f} games per second)")
+    return attempt_count
+
+def main():
+    pattern_matrix = get_pattern_matrix(all_words, all_words)
+    freqs = get_freqs()
+
+    num_boards = ""
+    while num_boards not in {"4", "8"}:
+        num_boards = input("How many boards (4 - Quordle, 8 - Octordle): ").strip()
+
+    num_games = ""
+    while not num_games.isdigit() or int(num_games) <= 0:
+        num_games = input("How many games to simulate: ").strip()
+
+    cheating = ""
+    allowed_chars = {"Y", "y", "N", "n"}
+    while cheating not in allowed_chars:
+        cheating = input("Do you want to cheat (Y/y - Yes, N/n - No): ")
+    cheating = cheating.upper() == 'Y'
+
+    simulate_multiboard(pattern_matrix, freqs, num_boards=int(num_boards), num_games=int(num_games), cheating=cheating)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+'''
+Builds opening books of precomputed second (and third) guess suggestions for every
+pattern a starting word can produce, so the play loops skip the most expensive turns
+'''
+
+import numpy as np
+import json
+import time
+from wordle import *
+from generate_data import *
+from simulator import *
+
+BOOK_SIZE = 10
+
+def add_book_entries(book, pattern_matrix, freqs, guesses, path, remaining_words, possible_answers, depth, cheating=False, top_k=BOOK_SIZE):
+    """
+    Adds the suggestions for every pattern the last guess can produce, replaying the
+    same filtering and scoring as the play loops. Branches are followed with the top
+    suggestion (the bot's guess) until the turn number reaches depth.
+    """
+    guess = guesses[-1]
+    score = len(guesses) + 1
+    candidates = possible_answers if cheating else remaining_words
+    candidate_indices = [word_indices[str(w)] for w in candidates]
+
+    for pattern_int in np.unique(pattern_matrix[word_indices[guess], candidate_indices]):
+        pattern_int = int(pattern_int)
+        if pattern_int == 242:
+            continue
+
+        new_remaining, remaining_indices, new_answers = filter_possible_words(guess, pattern_matrix, pattern_int, remaining_words, possible_answers, cheating=cheating)
+        if len(new_remaining) == 0:
+            continue
+
+        suggestions = get_endgame_suggestions(pattern_matrix, new_remaining, freqs, cheating=cheating)
+        if suggestions is None:
+            word_scores, weights = get_word_scores(new_remaining, remaining_indices, score, freqs, cheating=cheating)
+            suggestions = get_suggested_guesses(word_scores, guesses, score, new_remaining, new_answers, weights, cheating=cheating, verbose=False)
+
+        new_path = path + [guess, pattern_int]
+        book[get_opening_book_key(new_path)] = suggestions[:top_k]
+
+        if score < depth:
+            add_book_entries(book, pattern_matrix, freqs, guesses + [suggestions[0]], new_path, new_remaining, new_answers, depth, cheating=cheating, top_k=top_k)
+
+def build_opening_book(pattern_matrix, freqs, starters, cheating=False, depth=2, top_k=BOOK_SIZE):
+    # depth is the last turn covered by the book, 2 for second guesses or 3 for third guesses
+    book = {}
+    for starter in starters:
+        start = time.time()
+        add_book_entries(book, pattern_matrix, freqs, [starter], [], list(all_words), set(possible_words), depth, cheating=cheating, top_k=top_k)
+        print(f"Built {'cheating' if cheating else 'non-cheating'} book for {starter} in {time.time() - start:.1f}s")
+    return book
+
+def save_opening_book(book, cheating=False):
+    filename = get_opening_book_filename(cheating)
+    with open(filename, 'w') as f:
+        json.dump(book, f, separators=(',', ':'))
+    OPENING_BOOKS[filename] = book
+
+def main():
+    pattern_matrix = get_pattern_matrix(all_words, all_words)
+    freqs = get_freqs()
+    scores = get_initial_expected_scores(freqs)
+
+    n = ""
+    while not n.isdigit() or int(n) <= 0:
+        n = input("How many of the best starting words should the book cover: ").strip()
+    starters = sorted(scores, key=scores.get)[:int(n)]
+
+    depth = ""
+    while depth not in {"2", "3"}:
+        depth = input("Last turn to precompute (2 or 3): ").strip()
+
+    for cheating in (False, True):
+        book = build_opening_book(pattern_matrix, freqs, starters, cheating=cheating, depth=int(depth))
+        save_opening_book(book, cheating=cheating)
+        print(f"Saved {len(book)} entries to {get_opening_book_filename(cheating)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+'''
+Sweeps the (n, width) parameters of get_freq_probs over the solution set to tune the word prior
+'''
+
+import numpy as np
+import pandas as pd
+import json
+import time
+import itertools as it
+import os
+from multiprocessing import Pool
+from wordle import *
+from generate_data import *
+from endgame import *
+
+SWEEP_N = [2000, 3000, 4000, 5000, 6489]
+SWEEP_WIDTH = [6, 10, 14]
+MAX_SCORE = 6
+ALL_INDICES = np.arange(NUM_ALLOWED)
+
+# Histogram indices only depend on the remaining set, not the prior, so every
+# grid setting that reaches the same state reuses them
+CACHE_CELL_BUDGET = 50_000_000
+HISTOGRAM_INDEX_CACHE = {}
+CACHED_CELLS = 0
+SWEEP_MATRIX = None
+SWEEP_ENDGAME_CACHES = {}  # One endgame cache per grid setting, since the prior changes the results
+
+def get_histogram_indices(pattern_matrix, guess_indices, remaining_indices, cache=True):
+    # flat[a, b] is the cell of guess a's pattern against remaining word b in a
+    # (guesses x 243) histogram, so all weighted histograms are a single bincount
+    global CACHED_CELLS
+    key = (guess_indices is ALL_INDICES, remaining_indices.tobytes())
+    if cache and key in HISTOGRAM_INDEX_CACHE:
+        return HISTOGRAM_INDEX_CACHE[key]
+
+    offsets = np.arange(len(guess_indices), dtype=np.int32)[:, None] * 3**5
+    flat = offsets + pattern_matrix[np.ix_(guess_indices, remaining_indices)]
+
+    if cache:
+        if CACHED_CELLS + flat.size > CACHE_CELL_BUDGET:
+            HISTOGRAM_INDEX_CACHE.clear()
+            CACHED_CELLS = 0
+        HISTOGRAM_INDEX_CACHE[key] = flat
+        CACHED_CELLS += flat.size
+    return flat
+
+def get_weighted_histograms(pattern_matrix, guess_indices, remaining_indices, weights, chunk_size=1000):
+    # Same result as get_distributions, computed in chunks of guesses to bound memory
+    if len(guess_indices) * len(remaining_indices) <= CACHE_CELL_BUDGET // 10:
+        flat = get_histogram_indices(pattern_matrix, guess_indices, remaining_indices)
+        counts = np.bincount(flat.ravel(), weights=np.broadcast_to(weights, flat.shape).ravel(), minlength=flat.shape[0] * 3**5)
+        return counts.reshape(-1, 3**5)
+
+    histograms = np.zeros((len(guess_indices), 3**5))
+    for start in range(0, len(guess_indices), chunk_size):
+        rows = guess_indices[start:start + chunk_size]
+        flat = get_histogram_indices(pattern_matrix, rows, remaining_indices, cache=False)
+        counts = np.bincount(flat.ravel(), weights=np.broadcast_to(weights, flat.shape).ravel(), minlength=flat.shape[0] * 3**5)
+        histograms[start:start + len(rows)] = counts.reshape(-1, 3**5)
+    return histograms
+
+def get_expected_scores_from_histograms(histograms, guess_probs, weights):
+    # Array version of get_expected_scores for guesses whose histograms are already known
+    curr_entropy = get_entropy_with_freqs(weights)
+    expected_entropies = get_entropy_with_freqs(histograms)
+    return guess_probs + (1 - guess_probs) * (1 + guesses_from_entropy(curr_entropy - expected_entropies))
+
+def get_opening_guess(pattern_matrix, prior):
+    # Turn 1 always scores every allowed word against every allowed word
+    weights = prior / prior.sum()
+    histograms = get_weighted_histograms(pattern_matrix, ALL_INDICES, ALL_INDICES, weights)
+    scores = get_expected_scores_from_histograms(histograms, weights, weights)
+    return int(np.argmin(scores))
+
+def sweep_game(answer_index, opening_index, prior, pattern_matrix, endgame_cache=None, endgame_size=ENDGAME_SIZE):
+    """
+    Mirrors play_game_bot_with_freqs without cheating, working on index arrays:
+    after the opener, up to endgame_size remaining words are solved exactly with
+    the setting's prior, and larger sets are scored over the remaining words only,
+    with a switch to the max-entropy probe over all words when the best guess has
+    a dominant pattern.
+    """
+    endgame_cache = {} if endgame_cache is None else endgame_cache
+    guess = opening_index
+    guesses = [guess]
+    remaining = ALL_INDICES
+    score = 1
+
+    while guess != answer_index:
+        score += 1
+        pattern = pattern_matrix[guess, answer_index]
+        remaining = remaining[pattern_matrix[guess, remaining] == pattern]
+
+        if len(remaining) <= endgame_size:
+            endgame_scores = get_endgame_scores(pattern_matrix, remaining, prior, endgame_cache)
+            guess = word_indices[min(endgame_scores, key=endgame_scores.get)]
+            guesses.append(guess)
+            continue
+
+        weights = prior[remaining]
+        weights = weights / weights.sum()
+        histograms = get_weighted_histograms(pattern_matrix, remaining, remaining, weights)
+        scores = get_expected_scores_from_histograms(histograms, weights, weights)
+        best = int(np.argmin(scores))
+        guess = int(remaining[best])
+
+        if histograms[best].max() > 0.4 and len(remaining) > 2:
+            probe_histograms = get_weighted_histograms(pattern_matrix, ALL_INDICES, remaining, weights)
+            entropies = get_entropy_with_freqs(probe_histograms)
+            entropies[guesses] = -np.inf
+            guess = int(np.argmax(entropies))
+
+        guesses.append(guess)
+
+    return score
+
+def init_sweep_worker(pattern_matrix):
+    global SWEEP_MATRIX
+    SWEEP_MATRIX = pattern_matrix
+
+def sweep_answers(args):
+    # Each worker plays every grid setting on its chunk of answers so states
+    # shared between settings hit the same histogram cache
+    answer_indices, settings = args
+    scores = {}
+    for setting, opening_index, prior in settings:
+        cache = SWEEP_ENDGAME_CACHES.setdefault(setting, {})
+        scores[setting] = [sweep_game(a, opening_index, prior, SWEEP_MATRIX, cache) for a in answer_indices]
+    return scores
+
+def sweep_freq_priors(pattern_matrix, freqs, n_values=SWEEP_N, width_values=SWEEP_WIDTH, answers=None, processes=None):
+    answers = possible_words if answers is None else answers
+    answer_indices = [word_indices[str(word)] for word in answers]
+    processes = processes or os.cpu_count()
+
+    start = time.time()
+    settings = []
+    for n, width in it.product(n_values, width_values):
+        prior = get_prior_array(freqs, n, width)
+        opening_index = get_opening_guess(pattern_matrix, prior)
+        settings.append(((n, width), opening_index, prior))
+        print(f"n={n}, width={width}: opening guess {all_words[opening_index]}")
+
+    chunks = [answer_indices[i::processes] for i in range(processes)]
+    scores = {setting: [] for setting, _, _ in settings}
+    with Pool(processes, initializer=init_sweep_worker, initargs=(pattern_matrix,)) as pool:
+        for chunk_scores in pool.imap_unordered(sweep_answers, [(chunk, settings) for chunk in chunks if chunk]):
+            for setting, chunk in chunk_scores.items():
+                scores[setting].extend(chunk)
+
+    rows = []
+    for (n, width), opening_index, _ in settings:
+        setting_scores = np.array(scores[(n, width)])
+        rows.append({
+            "n": n,
+            "width": width,
+            "opening": str(all_words[opening_index]),
+            "average_score": float(setting_scores.mean()),
+            "failure_rate": float((setting_scores > MAX_SCORE).mean()),
+            "max_score": int(setting_scores.max()),
+        })
+
+    print(f"Swept {len(settings)} settings over {len(answer_indices)} answers in {time.time() - start:.1f}s")
+    return pd.DataFrame(rows).sort_values(by=["average_score", "failure_rate"])
+
+def main():
+    pattern_matrix = get_pattern_matrix(all_words, all_words)
+    freqs = get_freqs()
+
+    results = sweep_freq_priors(pattern_matrix, freqs)
+    print(results.to_string(index=False))
+
+    with open('./data/prior_sweep.json', 'w') as f:
+        json.dump(results.to_dict(orient='records'), f)
+
+if __name__ == "__main__":
+    main()
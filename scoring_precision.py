@@ -0,0 +1,96 @@
+'''
+Validates the reduced-precision scoring paths (float32 and integer pattern counts) against
+float64 over the whole solution set and reports the memory and time they save
+'''
+
+import numpy as np
+import json
+import time
+import tracemalloc
+from wordle import *
+from generate_data import *
+from simulator import *
+
+PRECISIONS = ["float64", "float32", "counts"]
+
+def measure_scoring(remaining_words, weights, precision, repeats=3):
+    # Best time and peak memory of scoring every allowed word for one state. Memory is
+    # traced in a separate run since tracing slows down every allocation
+    elapsed = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        get_expected_scores(all_words, remaining_words, weights, precision=precision)
+        elapsed = min(elapsed, time.perf_counter() - start)
+
+    tracemalloc.start()
+    get_expected_scores(all_words, remaining_words, weights, precision=precision)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+def play_all_games(pattern_matrix, initial_expected_scores, freqs, precision, cheating=True, answers=None):
+    # Guesses chosen for every answer, with the opening book off so every turn is scored live
+    answers = possible_words if answers is None else answers
+    set_scoring_precision(precision)
+    try:
+        start = time.time()
+        games = {}
+        for answer in answers:
+            _, guesses, _ = play_game_bot_with_freqs(str(answer), pattern_matrix, initial_expected_scores, freqs, cheating=cheating, discord=True, opening_book=False)
+            games[str(answer)] = guesses
+        return games, time.time() - start
+    finally:
+        set_scoring_precision("float64")
+
+def validate_precisions(pattern_matrix, initial_expected_scores, freqs, precisions=PRECISIONS, cheating=True, answers=None):
+    # Plays the solution set with each precision and compares every chosen guess to float64
+    report = {}
+    baseline, baseline_time = play_all_games(pattern_matrix, initial_expected_scores, freqs, "float64", cheating, answers)
+
+    # A state with the whole solution set remaining is the largest one scored after turn 1
+    remaining_words = [str(w) for w in possible_words]
+    freq_probs = get_word_prior_probs() if not cheating else get_cheat_freq_probs(2, remaining_words)
+    weights = get_weights(remaining_words, freq_probs)
+    baseline_state_time, baseline_peak = measure_scoring(remaining_words, weights, "float64")
+
+    for precision in precisions:
+        games, elapsed = (baseline, baseline_time) if precision == "float64" else play_all_games(pattern_matrix, initial_expected_scores, freqs, precision, cheating, answers)
+        mismatched = [answer for answer in baseline if games[answer] != baseline[answer]]
+        state_time, peak = (baseline_state_time, baseline_peak) if precision == "float64" else measure_scoring(remaining_words, weights, precision)
+
+        report[precision] = {
+            "games": len(games),
+            "mismatched_games": len(mismatched),
+            "mismatched_answers": mismatched[:20],
+            "simulation_seconds": round(elapsed, 2),
+            "scoring_seconds": round(state_time, 4),
+            "scoring_peak_mb": round(peak / 2**20, 2),
+            "distributions_mb": round(NUM_ALLOWED * 3**5 * np.dtype(PRECISION_DTYPES[precision]).itemsize / 2**20, 2),
+            "time_saved": f"{1 - state_time / baseline_state_time:.1%}",
+            "memory_saved": f"{1 - peak / baseline_peak:.1%}",
+        }
+        print(f"{precision}: {len(games) - len(mismatched)}/{len(games)} games chose the same guesses as float64")
+        print(f"    full scoring {state_time:.3f}s, peak {peak / 2**20:.1f}MB, simulation {elapsed:.1f}s")
+
+    return report
+
+def main():
+    pattern_matrix = get_pattern_matrix(all_words, all_words)
+    freqs = get_freqs()
+    initial_expected_scores = get_initial_expected_scores(freqs)
+
+    cheating = ""
+    allowed_chars = {"Y", "y", "N", "n"}
+    while cheating not in allowed_chars:
+        cheating = input("Do you want to cheat (Y/y - Yes, N/n - No): ")
+    cheating = cheating.upper() == 'Y'
+
+    # Without cheating the weights aren't uniform, so the counts path would just be float64
+    precisions = PRECISIONS if cheating else ["float64", "float32"]
+    report = validate_precisions(pattern_matrix, initial_expected_scores, freqs, precisions, cheating=cheating)
+
+    with open(f"./data/precision_report{'_cheat' if cheating else ''}.json", 'w') as f:
+        json.dump(report, f, indent=4)
+
+if __name__ == "__main__":
+    main()
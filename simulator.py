@@ -6,27 +6,34 @@ from ast import pattern
 import numpy as np
 import os
 import random
+import time
 from wordle import *
 from generate_data import *
+from letter_index import *
+from endgame import *
+from guess_pruning import *
 
 # Each tile's aria-label uses the format:
 # nth letter, [letter], [color]
 # color = "correct" (green), "present in another position" (yellow), "absent" (gray)
 
 def main():
-    pattern_matrix = get_pattern_matrix(all_words, all_words)
-    freqs = get_freqs()
-    expected_scores = get_initial_expected_scores(freqs)
-
     response = ""
-    allowed = {"1", "2", "3", "4"}
+    allowed = {"1", "2", "3", "4", "5"}
 
     while response not in allowed:
         print("1) Solver Assistant Mode")
         print("2) Test Bot Against Particular Word")
         print("3) Test Bot Against All Words")
         print("4) Print Results")
+        print("5) List Remaining Words From Feedback")
         response = input("Which would want: ")
+
+    # Listing remaining words only needs the letter index, not the pattern matrix
+    if response in {"1", "2", "3"}:
+        pattern_matrix = get_pattern_matrix(all_words, all_words)
+        freqs = get_freqs()
+        expected_scores = get_initial_expected_scores(freqs)
     
     match response:
         case "1":
@@ -37,7 +44,12 @@ def main():
                 cheating = input("Do you want to cheat (Y/y - Yes, N/n - No): ")
             cheating = cheating.upper() == 'Y'
 
-            play_game_assistant_mode(pattern_matrix, expected_scores, word_indices, freqs, cheating=cheating)
+            hard_mode = ""
+            while hard_mode not in allowed_chars:
+                hard_mode = input("Do you want to play hard mode (Y/y - Yes, N/n - No): ")
+            hard_mode = hard_mode.upper() == 'Y'
+
+            play_game_assistant_mode(pattern_matrix, expected_scores, word_indices, freqs, cheating=cheating, hard_mode=hard_mode)
 
         case "2":
             # Test bot against user input word
@@ -70,7 +82,12 @@ def main():
                 cheating = input("Do you want to cheat (Y/y - Yes, N/n - No): ")
             cheating = cheating.upper() == 'Y'
 
-            play_game_bot_with_freqs(answer, pattern_matrix, expected_scores, freqs, starting_word=starting_word, cheating=cheating)
+            hard_mode = ""
+            while hard_mode not in allowed_chars:
+                hard_mode = input("Do you want to play hard mode (Y/y - Yes, N/n - No): ")
+            hard_mode = hard_mode.upper() == 'Y'
+
+            play_game_bot_with_freqs(answer, pattern_matrix, expected_scores, freqs, starting_word=starting_word, cheating=cheating, hard_mode=hard_mode)
 
         case "3":
             # Test against all words
@@ -80,7 +97,12 @@ def main():
                 cheating = input("Do you want to cheat (Y/y - Yes, N/n - No): ")
             cheating = cheating.upper() == 'Y'
 
-            simulate_all_games_bot(pattern_matrix, expected_scores, freqs, cheating=cheating)
+            hard_mode = ""
+            while hard_mode not in allowed_chars:
+                hard_mode = input("Do you want to play hard mode (Y/y - Yes, N/n - No): ")
+            hard_mode = hard_mode.upper() == 'Y'
+
+            simulate_all_games_bot(pattern_matrix, expected_scores, freqs, cheating=cheating, hard_mode=hard_mode)
 
         case "4":
             # Print results
@@ -106,6 +128,10 @@ def main():
                 
             else:
                 print("File not found.")
+
+        case "5":
+            # Filter with accumulated feedback from the letter index
+            list_remaining_words()
                 
 
     # Test bot against a random or particular word
@@ -213,13 +239,17 @@ def play_game_piloted(answer, pattern_matrix, entropies, word_indices):
 
     return score
 
-def play_game_assistant_mode(pattern_matrix, initial_expected_scores, word_indices, freqs, cheating=False):
+def play_game_assistant_mode(pattern_matrix, initial_expected_scores, word_indices, freqs, cheating=False, opening_book=True, endgame_size=ENDGAME_SIZE, hard_mode=False):
     guesses = set()
+    path = []
+    constraints = new_constraints()
+    legal = None
+    suggested_guesses = None
     score = 0
     win = False
     word_scores = initial_expected_scores.copy() # Expected scores
     remaining_words = all_words.copy()
-    freq_probs = get_freq_probs(freqs) if not cheating else get_cheat_freq_probs(1)
+    freq_probs = get_word_prior_probs() if not cheating else get_cheat_freq_probs(1)
     weights = get_weights(remaining_words, freq_probs) # Probs
     # entropies = get_entropies(all_words, remaining_words, weights) # Entropies
     possible_answers = set(possible_words)
@@ -228,11 +258,12 @@ def play_game_assistant_mode(pattern_matrix, initial_expected_scores, word_indic
             score += 1
             # Need to aggregate expected score, entropy, and probability of being answer
             
-            # Get suggested guesses
-            suggested_guesses = get_suggested_guesses(word_scores, guesses, score, remaining_words, possible_answers, weights, cheating=cheating)
+            # Get suggested guesses, turn 1 is scored up front and later turns at the end of the previous one
+            if suggested_guesses is None:
+                suggested_guesses = get_suggested_guesses(word_scores, guesses, score, remaining_words, possible_answers, weights, cheating=cheating)
             
             # Get user guess
-            user_guess = get_user_guess(suggested_guesses)
+            user_guess = get_user_guess(suggested_guesses, legal)
             guesses.add(user_guess)
 
             # Get pattern user got from Wordle
@@ -256,28 +287,36 @@ def play_game_assistant_mode(pattern_matrix, initial_expected_scores, word_indic
                 print("No possible words remaining. Something went wrong.")
                 break
 
+            # Hard mode only allows guesses using every hint revealed so far
+            if hard_mode:
+                legal = get_hard_mode_mask(add_feedback(constraints, user_guess, pattern_int))
+
             # Update entropies for the next guess
-            freq_probs = get_freq_probs(freqs) if not cheating else get_cheat_freq_probs(score + 1, remaining_words)
-            weights = get_weights(remaining_words, freq_probs)
-            expected_scores = get_expected_scores(all_words, remaining_words, weights)
-            word_scores = {str(all_words[i]): expected_scores[i] for i in range(len(all_words)) if i in remaining_indices}
+            path += [user_guess, pattern_int]
+            suggested_guesses = get_next_suggestions(pattern_matrix, freqs, path, guesses, score + 1, remaining_words, remaining_indices, possible_answers, cheating=cheating, opening_book=opening_book, endgame_size=endgame_size, legal=legal)
 
     return score if win else -1
 
-def play_game_bot_with_freqs(answer, pattern_matrix, initial_expected_scores, freqs, starting_word=None, cheating=False, discord=False):
+def play_game_bot_with_freqs(answer, pattern_matrix, initial_expected_scores, freqs, starting_word=None, cheating=False, discord=False, opening_book=True, endgame_size=ENDGAME_SIZE, state_cache=None, hard_mode=False):
+    # state_cache lets repeated games (e.g. a starter tournament) reuse suggestions, see get_next_suggestions
     if not discord: print(f"Answer is {answer}")
     guess = ""
     score = 1
     guesses = []
     patterns = []
+    path = []
+    constraints = new_constraints()
+    legal = None
+    suggested_guesses = None
     word_scores = initial_expected_scores.copy()
     remaining_words = list(all_words.copy())
-    freq_probs = get_freq_probs(freqs) if not cheating else get_cheat_freq_probs(1)
+    freq_probs = get_word_prior_probs() if not cheating else get_cheat_freq_probs(1)
     weights = get_weights(remaining_words, freq_probs)
     possible_answers = set(possible_words)
     
     while guess.lower() != answer.lower():
-            suggested_guesses = get_suggested_guesses(word_scores, guesses, score, remaining_words, possible_answers, weights, cheating=cheating)
+            if suggested_guesses is None:
+                suggested_guesses = get_suggested_guesses(word_scores, guesses, score, remaining_words, possible_answers, weights, cheating=cheating, verbose=not discord)
             guess = starting_word if score == 1 and starting_word is not None else suggested_guesses[0]
             
             guesses.append(guess)
@@ -304,20 +343,23 @@ def play_game_bot_with_freqs(answer, pattern_matrix, initial_expected_scores, fr
                 if not discord: print("No possible words remaining. Something went wrong.")
                 break
 
+            # Hard mode only allows guesses using every hint revealed so far
+            if hard_mode:
+                legal = get_hard_mode_mask(add_feedback(constraints, guess, pattern_int))
+
             # Update entropies for the next guess
-            freq_probs = get_freq_probs(freqs) if not cheating else get_cheat_freq_probs(score, remaining_words)
-            weights = get_weights(remaining_words, freq_probs)
-            expected_scores = get_expected_scores(all_words, remaining_words, weights)
-            word_scores = {str(all_words[i]): expected_scores[i] for i in range(len(all_words)) if i in remaining_indices}
+            path += [guess, pattern_int]
+            suggested_guesses = get_next_suggestions(pattern_matrix, freqs, path, guesses, score, remaining_words, remaining_indices, possible_answers, cheating=cheating, opening_book=opening_book, endgame_size=endgame_size, state_cache=state_cache, legal=legal, verbose=not discord)
 
     return score if not discord else (score, guesses, patterns)
 
-def simulate_all_games_bot(pattern_matrix, initial_expected_scores, freqs, cheating=False):
+def simulate_all_games_bot(pattern_matrix, initial_expected_scores, freqs, cheating=False, hard_mode=False):
     filename = input("Enter filename to store results: ")
     filename = filename.strip()
     attempt_count = {}
+    start = time.time()
     for answer in possible_words:
-        score = play_game_bot_with_freqs(answer, pattern_matrix, initial_expected_scores, freqs, cheating=cheating)
+        score = play_game_bot_with_freqs(answer, pattern_matrix, initial_expected_scores, freqs, cheating=cheating, hard_mode=hard_mode)
         if score not in attempt_count:
             attempt_count[score] = {str(answer)}
         else:
@@ -332,32 +374,92 @@ def simulate_all_games_bot(pattern_matrix, initial_expected_scores, freqs, cheat
     worst_words = attempt_count[max_attempts]
     print(f"Worst words were {worst_words} with {max_attempts} attempts.")
 
+    elapsed = time.time() - start
+    average = sum(k * len(v) for k, v in attempt_count.items()) / len(possible_words)
+    fails = sum(len(v) for k, v in attempt_count.items() if k > 6)
+    print(f"{'Hard' if hard_mode else 'Normal'} mode: average {average:.4f} attempts, {fails} games over 6 guesses, played in {elapsed:.1f}s")
+
     with open(f'./data/{filename}.json', 'w') as f:
         results = {k: list(v) for k, v in attempt_count.items()}
         json.dump(results, f)
-def get_suggested_guesses(word_scores, guesses, score, remaining_words, possible_answers, weights, cheating=False):
+def get_suggested_guesses(word_scores, guesses, score, remaining_words, possible_answers, weights, cheating=False, prune=True, legal=None, verbose=True):
+    # word_scores only covers remaining words, which are always legal in hard mode, so legal
+    # (see get_next_suggestions) only restricts the probe guesses
     candidates = {w: s for w, s in word_scores.items() if w not in guesses}
     suggested_guesses = sorted(candidates, key=candidates.get)
     best_guess = suggested_guesses[0]
 
     if score > 1:
-        pattern_probs = get_distributions(remaining_words, remaining_words, weights)
+        # Probabilities are compared against a threshold, and this is only remaining x remaining
+        pattern_probs = get_distributions(remaining_words, remaining_words, weights, precision="float64")
         idx = remaining_words.index(best_guess)
 
         # Switch to probe guessing if there is a dominant pattern
         if (max(pattern_probs[idx]) > 0.4 and 
             ((cheating and len(possible_answers) > 2) or (not cheating and len(remaining_words) > 2))):
             # Get entropies of all_words vs possible_words, next guess is max entropy over possible words
-            print(f"Using probe guessing for guess {score}")
-            entropies = get_entropies(all_words, remaining_words, weights)
-            candidates = {str(w): e for w, e in zip(all_words, entropies) if w not in guesses}
+            if verbose: print(f"Using probe guessing for guess {score}")
+            if prune:
+                # Same top guess as scoring all_words, see guess_pruning.py
+                return get_pruned_probe_guesses(remaining_words, weights, guesses, legal)
+            probes = all_words if legal is None else all_words[legal]
+            entropies = get_entropies(probes, remaining_words, weights)
+            candidates = {str(w): e for w, e in zip(probes, entropies) if w not in guesses}
             suggested_guesses = sorted(candidates, key=candidates.get, reverse=True)
     
     return suggested_guesses
 
-def get_user_guess(suggested_guesses=None):
+def list_remaining_words():
+    constraints = new_constraints()
+    for i in range(6):
+        guess = get_user_guess()
+        pattern = get_wordle_feedback()
+        print(f"Guess {i+1}: {guess} -> {get_emoji_pattern(string_to_pattern_int(pattern))}")
+        if string_to_pattern_int(pattern) == 242:
+            print(f"Solved! The word was {guess}.")
+            break
+
+        add_feedback(constraints, guess, pattern)
+        remaining_words = filter_with_constraints(constraints)
+        remaining_answers = [w for w in remaining_words if w in possible_words]
+        print(f"{len(remaining_words)} allowed words remaining, {len(remaining_answers)} of them in the solution set.")
+        print(f"Remaining solution words: {remaining_answers[:50]}")
+        if len(remaining_words) == 0:
+            print("No possible words remaining. Check the feedback that was entered.")
+            break
+
+# Suggestions for the guess after path, from the first source covering the state: the state
+# cache, the opening book, the exact endgame, then scoring the remaining words live.
+# state_cache maps remaining index sets to suggestions. They only depend on the remaining set
+# (and cheating, which must stay the same for every game sharing a cache).
+# legal is the hard mode mask of allowed guesses from get_hard_mode_mask, or None in normal mode.
+# The opening book was built without hard mode, so it is skipped when legal is given
+def get_next_suggestions(pattern_matrix, freqs, path, guesses, score, remaining_words, remaining_indices, possible_answers, cheating=False, opening_book=True, endgame_size=ENDGAME_SIZE, state_cache=None, legal=None, verbose=True):
+    state_key = frozenset(remaining_indices) if legal is None else (frozenset(remaining_indices), np.packbits(legal).tobytes())
+    suggested_guesses = state_cache.get(state_key) if state_cache is not None else None
+    if suggested_guesses is None and opening_book and legal is None:
+        suggested_guesses = get_opening_book_suggestions(path, cheating)
+    if suggested_guesses is None:
+        suggested_guesses = get_endgame_suggestions(pattern_matrix, remaining_words, freqs, cheating=cheating, max_size=endgame_size, legal=legal)
+    if suggested_guesses is None:
+        word_scores, weights = get_word_scores(remaining_words, remaining_indices, score, freqs, cheating=cheating)
+        suggested_guesses = get_suggested_guesses(word_scores, guesses, score, remaining_words, possible_answers, weights, cheating=cheating, legal=legal, verbose=verbose)
+    if state_cache is not None:
+        state_cache[state_key] = suggested_guesses[:10]
+    return suggested_guesses
+
+# Expected scores of the remaining words for the next guess, along with their weights
+def get_word_scores(remaining_words, remaining_indices, score, freqs, cheating=False):
+    freq_probs = get_word_prior_probs() if not cheating else get_cheat_freq_probs(score, remaining_words)
+    weights = get_weights(remaining_words, freq_probs)
+    # Only the remaining words are ever suggested from expected scores, so only score those
+    expected_scores = get_expected_scores(remaining_words, remaining_words, weights)
+    word_scores = {str(word): score for word, score in zip(remaining_words, expected_scores)}
+    return word_scores, weights
+
+def get_user_guess(suggested_guesses=None, legal=None):
     user_guess = ""
-    while len(user_guess) != 5 or user_guess.upper() not in all_words:
+    while True:
         if suggested_guesses is not None: 
             print(f"Top 10 suggested guesses: {suggested_guesses[:10]}")
         user_guess = input(f"\nEnter a guess: ").strip()
@@ -365,6 +467,10 @@ def get_user_guess(suggested_guesses=None):
             print("Please enter a 5-letter word")
         elif user_guess.upper() not in all_words:
             print("Not a valid word")
+        elif legal is not None and not legal[word_indices[user_guess.upper()]]:
+            print("Hard mode: the guess must use every revealed hint")
+        else:
+            break
     return user_guess.upper() 
 
 def get_wordle_feedback():
@@ -380,32 +486,16 @@ def get_wordle_feedback():
             print("Please input a valid pattern given from Wordle feedback (G/g - green, Y/y - yellow, X/x - gray)")
     
     # Convert pattern to ternary string
-    pattern = pattern.upper()
-    pattern = list(pattern)
-    for j in range(len(pattern)):
-        c = pattern[j]
-        if c == 'G':
-            pattern[j] = EXACT
-        elif c == 'Y':
-            pattern[j] = MISPLACED
-        else:
-            pattern[j] = MISS
-    
-    return pattern
+    return feedback_to_pattern(pattern)
 
 def filter_possible_words(guess, pattern_matrix, pattern_int, remaining_words, possible_answers, cheating=False):
-    new_remaining_words = []
-    remaining_indices = set()
-    guess_index = word_indices[guess]
-    for word in all_words:
-        word_index = word_indices[word]
-        if (pattern_matrix[guess_index, word_index] == pattern_int and 
-            ((cheating and word in possible_answers) or (not cheating and word in remaining_words))):
-            new_remaining_words.append(str(word))
-            remaining_indices.add(word_index)
-    remaining_words = new_remaining_words
+    # Words matching the pattern come from one row of the pattern matrix, kept in all_words order
+    allowed = possible_answers if cheating else set(str(word) for word in remaining_words)
+    matches = np.nonzero(pattern_matrix[word_indices[guess]] == pattern_int)[0]
+    remaining_indices = [int(i) for i in matches if str(all_words[i]) in allowed]
+    remaining_words = [str(all_words[i]) for i in remaining_indices]
     possible_answers = possible_answers.intersection(set(remaining_words))
-    return remaining_words, remaining_indices, possible_answers
+    return remaining_words, set(remaining_indices), possible_answers
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
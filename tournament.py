@@ -0,0 +1,92 @@
+'''
+Starting-word tournament: plays the solver from each of the best starters by initial expected
+score against every answer in the solution set and ranks them by measured performance
+'''
+
+import numpy as np
+import json
+import time
+import os
+from multiprocessing import Pool
+from wordle import *
+from generate_data import *
+from simulator import *
+
+TOURNAMENT_SIZE = 20
+MAX_SCORE = 6
+NUM_WORST_WORDS = 10
+TOURNAMENT_STATE = {}
+
+def init_tournament_worker(pattern_matrix, initial_expected_scores, freqs, cheating):
+    TOURNAMENT_STATE.update({
+        "pattern_matrix": pattern_matrix,
+        "initial_expected_scores": initial_expected_scores,
+        "freqs": freqs,
+        "cheating": cheating,
+        # Suggestions keyed by remaining set, shared by every starter this worker plays
+        "state_cache": {},
+    })
+
+def play_starter(starter, answers=None):
+    # Plays every answer from one starter and summarizes the scores
+    answers = possible_words if answers is None else answers
+    state = TOURNAMENT_STATE
+    start = time.time()
+    scores = {}
+    for answer in answers:
+        score, _, _ = play_game_bot_with_freqs(str(answer), state["pattern_matrix"], state["initial_expected_scores"], state["freqs"], starting_word=starter, cheating=state["cheating"], discord=True, state_cache=state["state_cache"])
+        scores[str(answer)] = score
+
+    values = np.array(list(scores.values()))
+    worst = max(values)
+    return {
+        "starter": starter,
+        "mean_score": float(values.mean()),
+        "fail_count": int((values > MAX_SCORE).sum()),
+        "max_score": int(worst),
+        "worst_words": sorted(w for w, s in scores.items() if s == worst)[:NUM_WORST_WORDS],
+        "seconds": round(time.time() - start, 1),
+    }
+
+def run_tournament(pattern_matrix, initial_expected_scores, freqs, num_starters=TOURNAMENT_SIZE, cheating=True, answers=None, processes=None):
+    starters = sorted(initial_expected_scores, key=initial_expected_scores.get)[:num_starters]
+    processes = min(processes or os.cpu_count(), len(starters))
+
+    start = time.time()
+    results = []
+    with Pool(processes, initializer=init_tournament_worker, initargs=(pattern_matrix, initial_expected_scores, freqs, cheating)) as pool:
+        # Neighbouring starters share letters and so more states, keep them on the same worker
+        chunksize = max(1, len(starters) // processes)
+        for result in pool.imap_unordered(play_starter, starters, chunksize=chunksize):
+            print(f"{result['starter']}: mean {result['mean_score']:.4f}, {result['fail_count']} fails ({result['seconds']}s)")
+            results.append(result)
+
+    print(f"Played {len(starters)} starters in {time.time() - start:.1f}s")
+    return sorted(results, key=lambda r: (r["mean_score"], r["fail_count"]))
+
+def save_tournament(results, cheating=True):
+    with open(get_tournament_filename(cheating), 'w') as f:
+        json.dump(results, f, indent=4)
+
+def main():
+    pattern_matrix = get_pattern_matrix(all_words, all_words)
+    freqs = get_freqs()
+    initial_expected_scores = get_initial_expected_scores(freqs)
+
+    n = ""
+    while not n.isdigit() or int(n) <= 0:
+        n = input("How many of the best starting words should play: ").strip()
+
+    cheating = ""
+    allowed_chars = {"Y", "y", "N", "n"}
+    while cheating not in allowed_chars:
+        cheating = input("Do you want to cheat (Y/y - Yes, N/n - No): ")
+    cheating = cheating.upper() == 'Y'
+
+    results = run_tournament(pattern_matrix, initial_expected_scores, freqs, num_starters=int(n), cheating=cheating)
+    save_tournament(results, cheating)
+    for rank, r in enumerate(results, 1):
+        print(f"{rank}. {r['starter']}: mean {r['mean_score']:.4f}, {r['fail_count']} fails, worst {r['max_score']} ({', '.join(r['worst_words'])})")
+
+if __name__ == "__main__":
+    main()
@@ -47,6 +47,20 @@ def get_emoji_pattern(pattern):
     d = {MISS: "⬛", MISPLACED: "🟨", EXACT: "🟩"}
     return "".join(d[x] for x in pattern_int_to_string(pattern))
 
+# Converts Wordle feedback like "GYXXG" (G - green, Y - yellow, X - gray) to a pattern
+def feedback_to_pattern(feedback):
+    if not isinstance(feedback, str):
+        raise ValueError(f"Invalid Wordle feedback {feedback!r}, expected a string of 5 G/Y/X")
+    feedback = feedback.strip().upper()
+    if len(feedback) != 5 or set(feedback) - {"G", "Y", "X"}:
+        raise ValueError(f"Invalid Wordle feedback {feedback}, expected 5 of G/Y/X")
+    d = {"G": EXACT, "Y": MISPLACED, "X": MISS}
+    return [d[c] for c in feedback]
+
+def pattern_to_feedback(pattern):
+    d = {MISS: "X", MISPLACED: "Y", EXACT: "G"}
+    return "".join(d[x] for x in pattern)
+
 def word_eval(word, guess):
     # Count occurrences of each letter in the target word
     word = word.lower()